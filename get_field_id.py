@@ -1,10 +1,36 @@
+import functools
 import json
 import logging
-import re
+import threading
+import time
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util import make_headers
+from urllib3.util.retry import Retry
+
+try:
+    # orjson 可直接解析 UTF-8 bytes 且速度較快；未安裝時退回標準函式庫
+    from orjson import loads as json_loads
+except ImportError:
+    json_loads = json.loads
 
 URLS_FILE = "forms_url.txt"
 
+# 連線逾時與讀取逾時（秒）
+REQUEST_TIMEOUT = (3.05, 7)
+
+# 表單 URL 與欄位 ID 的磁碟快取（以短網址為鍵），超過有效期限才重新連網抓取
+CACHE_FILE = "form/.entry_cache.json"
+CACHE_TTL_SECONDS = 3600
+_cache_lock = threading.Lock()
+_cache = None
+
+# 抓取表單頁面時要求壓縮傳輸；accept_encoding=True 只會列出 urllib3 能解壓的格式（已安裝 brotli 時包含 br）
+FORM_HEADERS = make_headers(accept_encoding=True, user_agent="Mozilla/5.0")
+
+# Google 表單會將其結構資訊存在名為 FB_PUBLIC_LOAD_DATA_ 的 JS 變數中
+_FB_DATA_PREFIX = b'var FB_PUBLIC_LOAD_DATA_ = '
+
 # 設定 logging
 logging.basicConfig(
     level=logging.INFO, 
@@ -12,11 +38,110 @@ logging.basicConfig(
     datefmt='%Y-%m-%d %H:%M:%S'
 )
 
+# 共用的 Session：重複使用 keep-alive 連線，避免每次請求都重新進行 TCP/TLS 握手
+# 建立連線失敗時 urllib3 對任何方法（包含表單提交的 POST）都會重試；
+# 讀取逾時與 5xx 只對冪等的方法重試，POST 不在預設的 allowed_methods 中，避免同一份表單被重複提交
+SESSION = requests.Session()
+_adapter = HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=8,
+    max_retries=Retry(total=2, backoff_factor=0.15, status_forcelist=(500, 502, 503, 504))
+)
+SESSION.mount("https://", _adapter)
+SESSION.mount("http://", _adapter)
+
+
 class FormClosedException(Exception):
     """自訂異常：用於表示表單已關閉、已滿或不接受回應"""
     pass
 
 
+def close_session():
+    """關閉共用的 Session，釋放連線池中的所有連線。"""
+    SESSION.close()
+
+
+def _load_cache():
+    """
+    取得快取內容：第一次呼叫時讀取快取檔案（不存在或內容損毀時視為空），
+    之後整個執行期間都直接使用記憶體中的同一份字典。
+    """
+    global _cache
+    if _cache is None:
+        try:
+            with open(CACHE_FILE, "r", encoding="utf-8") as cache_file:
+                cache = json.load(cache_file)
+        except (OSError, ValueError):
+            cache = {}
+        _cache = cache if isinstance(cache, dict) else {}
+    return _cache
+
+
+def _save_cache(cache):
+    """將快取寫回檔案，寫入失敗只記錄警告，不影響主流程。"""
+    try:
+        with open(CACHE_FILE, "w", encoding="utf-8") as cache_file:
+            json.dump(cache, cache_file, ensure_ascii=False, indent=2)
+    except OSError as e:
+        logging.warning(f"無法寫入快取檔案 {CACHE_FILE}。 {e}")
+
+
+def _is_fresh(entry):
+    """判斷快取項目是否仍在有效期限內。"""
+    return isinstance(entry, dict) and entry.get("cached_at", 0) > time.time() - CACHE_TTL_SECONDS
+
+
+def _get_cached_by_short_url(short_url):
+    """依短網址取得仍有效的快取項目副本，沒有則返回 None。"""
+    with _cache_lock:
+        entry = _load_cache().get(short_url)
+        return dict(entry) if _is_fresh(entry) else None
+
+
+def _get_cached_by_form_url(form_url):
+    """依完整表單 URL 取得仍有效的快取項目副本，沒有則返回 None。"""
+    # 快取字典由多個執行緒共用，走訪必須在鎖內進行，避免其他執行緒同時新增項目
+    with _cache_lock:
+        entry = next((entry for entry in _load_cache().values() if _is_fresh(entry) and entry.get("form_url") == form_url), None)
+        return dict(entry) if entry else None
+
+
+def _cache_form_url(short_url, form_url):
+    """記錄短網址解析出的表單 URL（會清除舊的欄位 ID）。"""
+    with _cache_lock:
+        cache = _load_cache()
+        cache[short_url] = {"form_url": form_url, "cached_at": time.time()}
+        _save_cache(cache)
+
+
+def _cache_entry_ids(form_url, name_entry, option_entry, reason_entry):
+    """將欄位 ID 寫入所有對應此表單 URL 的快取項目。"""
+    with _cache_lock:
+        cache = _load_cache()
+        for entry in cache.values():
+            if isinstance(entry, dict) and entry.get("form_url") == form_url:
+                entry.update(name_entry=name_entry, option_entry=option_entry, reason_entry=reason_entry)
+        _save_cache(cache)
+
+
+def _invalidate_cache(form_url):
+    """移除所有對應此表單 URL 的快取項目（例如表單結構解析失敗時）。"""
+    with _cache_lock:
+        cache = _load_cache()
+        stale_keys = [key for key, entry in cache.items() if not isinstance(entry, dict) or entry.get("form_url") == form_url]
+        if stale_keys:
+            for key in stale_keys:
+                del cache[key]
+            _save_cache(cache)
+
+
+@functools.lru_cache(maxsize=None)
+def _read_short_urls(urls_file_path):
+    """讀取短網址清單並略過空白行；結果依檔案路徑快取，讀取失敗時拋出 OSError（不會被快取）。"""
+    with open(urls_file_path, "r", encoding="utf-8") as url_file:
+        return tuple(line.strip() for line in url_file if line.strip())
+
+
 def resolve_short_url(day_number, mode=1):
     """
     根據星期數字和模式，從 URL 檔案中讀取短網址並解析為完整的表單 URL。
@@ -41,10 +166,9 @@ def resolve_short_url(day_number, mode=1):
         logging.error(f"星期數字必須在 1-7 之間，收到：{day_index}")
         return None
     
-    # 讀取 URL 檔案
+    # 讀取 URL 檔案（同一個檔案只讀取一次，多天共用）
     try:
-        with open(urls_file_path, "r", encoding="utf-8") as url_file:
-            urls = [line.strip() for line in url_file if line.strip()]
+        urls = _read_short_urls(urls_file_path)
     except OSError as e:
         logging.error(f"無法讀取 URL 清單檔案 {urls_file_path}。 {e}")
         return None
@@ -55,24 +179,34 @@ def resolve_short_url(day_number, mode=1):
         return None
     
     short_url = urls[day_index - 1]
+    
+    cached = _get_cached_by_short_url(short_url)
+    if cached and cached.get("form_url"):
+        logging.info(f"使用快取的第 {day_index} 天表單 URL: {cached['form_url']}")
+        return cached["form_url"]
+    
     logging.info(f"正在從第 {day_index} 天的短網址 {short_url} 解析正式表單網址...")
     
     # 解析短網址
     try:
-        resolve_response = requests.get(short_url, allow_redirects=False)
+        resolve_response = SESSION.get(short_url, allow_redirects=False, timeout=REQUEST_TIMEOUT)
         resolve_response.raise_for_status()
         form_url = resolve_response.headers.get("Location")
         if not form_url:
             logging.error("短網址回應缺少 Location 標頭。")
             return None
         logging.info(f"成功解析表單 URL: {form_url}")
+        _cache_form_url(short_url, form_url)
         return form_url
+    except requests.exceptions.Timeout as e:
+        logging.error(f"解析短網址逾時，可稍後重試。 {e}")
+        return None
     except requests.exceptions.RequestException as e:
         logging.error(f"解析短網址時失敗。 {e}")
         return None
 
 
-def fetch_form_entry_ids_for_day(form_url, day_number):
+def fetch_form_entry_ids_for_day(form_url, day_number, html=None):
     """
     從 Google 表單中抓取欄位的 Entry ID。
     
@@ -82,6 +216,7 @@ def fetch_form_entry_ids_for_day(form_url, day_number):
     參數:
         form_url: 完整的表單 URL
         day_number: 星期數字 (1-7)，用於判斷是否需要抓取原因欄位
+        html: 已下載的表單頁面原始 bytes（可選），提供時直接解析，不再重新請求
     
     返回:
         tuple: (name_entry, option_entry, reason_entry)
@@ -98,43 +233,64 @@ def fetch_form_entry_ids_for_day(form_url, day_number):
         logging.error("表單 URL 為空，無法抓取欄位 ID。")
         return name_entry, option_entry, reason_entry
     
-    logging.info(f"正在從 {form_url} 抓取表單欄位資訊...")
+    # 已提供剛下載的頁面時直接解析，確保使用表單目前的欄位 ID；只有需要連網時才使用快取
+    cached = _get_cached_by_form_url(form_url) if html is None else None
+    if cached and cached.get("name_entry") and cached.get("option_entry") and (not need_reason or cached.get("reason_entry")):
+        logging.info(f"使用快取的欄位 ID: 姓名={cached['name_entry']}, 選項={cached['option_entry']}, 原因={cached.get('reason_entry')}")
+        return cached["name_entry"], cached["option_entry"], cached.get("reason_entry") if need_reason else None
     
     try:
-        response = requests.get(form_url)
-        response.raise_for_status()
+        if html is None:
+            logging.info(f"正在從 {form_url} 抓取表單欄位資訊...")
+            response = SESSION.get(form_url, headers=FORM_HEADERS, timeout=REQUEST_TIMEOUT)
+            response.raise_for_status()
+            body = response.content
+        else:
+            logging.info(f"正在從已下載的 {form_url} 頁面解析表單欄位資訊...")
+            body = html.encode("utf-8") if isinstance(html, str) else html
         
-        # Google 表單會將其結構資訊存在名為 FB_PUBLIC_LOAD_DATA_ 的 JS 變數中
-        form_data_match = re.search(r'var FB_PUBLIC_LOAD_DATA_ = (.*?);', response.text)
-        if not form_data_match:
+        # 直接在原始 bytes 上定位，避免先將整個頁面解碼成 str
+        start = body.find(_FB_DATA_PREFIX)
+        end = body.find(b';', start) if start != -1 else -1
+        if end == -1:
             logging.error("在頁面原始碼中找不到表單結構資料 (FB_PUBLIC_LOAD_DATA_)")
+            _invalidate_cache(form_url)
             return name_entry, option_entry, reason_entry
         
         # 解析這個 JS 變數的內容 (它是一個 JSON 格式的陣列)
-        form_data = json.loads(form_data_match.group(1))
+        form_data = json_loads(body[start + len(_FB_DATA_PREFIX):end])
         
-        entry_map = {}
-        # 問題列表通常儲存在這個巢狀結構中
+        # 問題列表通常儲存在這個巢狀結構中，單次走訪並根據關鍵字找到我們需要的 entry ID
         questions = form_data[1][1]
         for question in questions:
             question_text = question[1]  # 取得問題的文字描述
-            entry_id = question[4][0][0]  # 取得問題對應的 entry ID
-            entry_map[question_text] = f"entry.{entry_id}"
+            entry_id = f"entry.{question[4][0][0]}"  # 取得問題對應的 entry ID
+            
+            if name_entry is None and "姓名" in question_text:
+                name_entry = entry_id
+            elif option_entry is None and "排休" in question_text:
+                option_entry = entry_id
+            elif need_reason and reason_entry is None and "原因" in question_text:
+                # 只在星期六、日才抓取原因欄位
+                reason_entry = entry_id
+            
+            if name_entry and option_entry and (not need_reason or reason_entry):
+                break
         
-        # 根據問題的關鍵字，找到我們需要的 entry ID
-        name_entry = next((v for k, v in entry_map.items() if "姓名" in k), None)
-        option_entry = next((v for k, v in entry_map.items() if "排休" in k), None)
-        
-        # 只在星期六、日才抓取原因欄位
         if need_reason:
-            reason_entry = next((v for k, v in entry_map.items() if "原因" in k), None)
             logging.info(f"抓取到欄位 ID: 姓名={name_entry}, 選項={option_entry}, 原因={reason_entry}")
         else:
             logging.info(f"抓取到欄位 ID: 姓名={name_entry}, 選項={option_entry} (星期 {day_number} 不需要原因)")
         
+        if name_entry and option_entry and (not need_reason or reason_entry):
+            _cache_entry_ids(form_url, name_entry, option_entry, reason_entry)
+        
+    except requests.exceptions.Timeout as e:
+        logging.error(f"訪問表單頁面逾時，可稍後重試。 {e}")
     except requests.exceptions.RequestException as e:
         logging.error(f"無法訪問表單頁面。 {e}")
     except (AttributeError, IndexError, json.JSONDecodeError) as e:
         logging.error(f"解析表單結構時失敗，可能是表單格式有變。 {e}")
+        _invalidate_cache(form_url)
     
-    return name_entry, option_entry, reason_entry
\ No newline at end of file
+    return name_entry, option_entry, reason_entry
@@ -1,20 +1,27 @@
 #!/usr/bin/env python3
 
+import atexit
 import requests
 import re
 import logging
+import socket
 import sys
+import threading
 import time
 from datetime import datetime, timedelta, time as dt_time
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from get_field_id import resolve_short_url, fetch_form_entry_ids_for_day, FormClosedException
-from mail.send_mail import send_summary_email
+from urllib3.util.connection import allowed_gai_family
+from get_field_id import resolve_short_url, fetch_form_entry_ids_for_day, close_session, FormClosedException, FORM_HEADERS, REQUEST_TIMEOUT, SESSION
 
 # 自訂異常：用於表示表單資料準備階段發生的錯誤
 class PreparationException(Exception):
     pass
 
 # 設定 logging
+# 日誌格式用不到執行緒／行程資訊，不必在每筆紀錄中收集
+logging.logThreads = False
+logging.logProcesses = False
+logging.logMultiprocessing = False
 logging.basicConfig(
     level=logging.INFO, 
     format='%(asctime)s.%(msecs)03d - %(levelname)s - %(message)s',
@@ -28,72 +35,80 @@ DAY_MAP = {
 
 DAY_NAMES = ['', '星期一', '星期二', '星期三', '星期四', '星期五', '星期六', '星期日']
 
+# data.txt 的欄位，每行格式為「欄位:值」（也接受全形冒號）
+CONFIG_KEYS = ('姓名', '請假星期', '星期六原因', '星期日原因')
+CONFIG_RE = re.compile(r'^(?P<key>姓名|請假星期|星期六原因|星期日原因)\s*[:：]\s*(?P<val>.*)$')
+# 請假星期的分隔符號（頓號、半形/全形逗號或空白）
+DAY_SPLIT_RE = re.compile(r'[、,，\s]+')
+
+# 計算原因字數時要忽略的空白字元
+_WS_DELETE = str.maketrans('', '', ' \t\n\r\u3000\xa0')
+
+# 根據您提供的截圖和 HTML，定義提交成功的具體特徵
+# 1. 成功訊息文字
+SUCCESS_MESSAGE = "我們已經收到您回覆的表單。"
+# 2. "提交其他回應" 的連結文字
+SUBMIT_ANOTHER_LINK_TEXT = "提交其他回應"
+# 預先編碼成 UTF-8，直接在回應的原始 bytes 中比對
+SUCCESS_MESSAGE_BYTES = SUCCESS_MESSAGE.encode('utf-8')
+SUBMIT_ANOTHER_LINK_BYTES = SUBMIT_ANOTHER_LINK_TEXT.encode('utf-8')
+
+# 表單頁面中的 fbzx token（直接比對原始 bytes，不必先解碼整個 HTML）
+FBZX_RE = re.compile(rb'name="fbzx" value="([^"]+)"')
+
+# 提交前預先解析 DNS 的主機，以及 DNS 快取的有效時間（秒）
+DNS_WARM_HOSTS = ("docs.google.com",)
+DNS_CACHE_TTL_SECONDS = 900
+
+_dns_cache = {}
+_original_getaddrinfo = socket.getaddrinfo
+
 
 def read_config_file(file_path="data.txt"):
     """
     讀取並解析 data.txt 設定檔。
-    返回包含姓名、請假星期、原因的字典，失敗則返回 None。
+    返回包含姓名、請假星期（數字與中文名稱）、原因的字典，失敗則返回 None。
     """
     try:
         with open(file_path, 'r', encoding='utf-8') as f:
-            lines = f.readlines()
+            lines = f.read().splitlines()
+        
+        # 逐行比對「欄位:值」，欄位順序不拘
+        fields = {}
+        for line in lines:
+            match = CONFIG_RE.match(line.strip())
+            if match:
+                fields[match['key']] = match['val'].strip()
         
-        if len(lines) < 4:
-            logging.error(f"設定檔 {file_path} 格式不正確，至少需要 4 行。")
+        missing_keys = [key for key in CONFIG_KEYS if key not in fields]
+        if missing_keys:
+            logging.error(f"設定檔 {file_path} 格式不正確，缺少：{'、'.join(f'「{key}:」' for key in missing_keys)}")
             return None
         
         # 解析姓名
-        name_line = lines[0].strip()
-        if not name_line.startswith('姓名:'):
-            logging.error("設定檔第一行格式錯誤，應為「姓名:」")
-            return None
-        name = name_line.split(':', 1)[1].strip()
+        name = fields['姓名']
         if not name:
             logging.error("姓名不可為空")
             return None
         
-        # 解析請假星期
-        days_line = lines[1].strip()
-        if not days_line.startswith('請假星期:'):
-            logging.error("設定檔第二行格式錯誤，應為「請假星期:」")
-            return None
-        days_str = days_line.split(':', 1)[1].strip()
-        if not days_str:
+        # 解析請假星期（用頓號、逗號或空白分隔）
+        day_chars = [d for d in DAY_SPLIT_RE.split(fields['請假星期']) if d]
+        if not day_chars:
             logging.error("請假星期不可為空")
             return None
         
-        # 解析星期（用頓號分隔）
-        day_chars = [d.strip() for d in days_str.split('、') if d.strip()]
-        days = []
-        for day_char in day_chars:
-            if day_char not in DAY_MAP:
-                logging.error(f"無效的星期：{day_char}，請使用一、二、三、四、五、六、日")
-                return None
-            days.append(DAY_MAP[day_char])
-        
-        if not days:
-            logging.error("請假星期不可為空")
-            return None
-        
-        # 解析星期六原因
-        reason_sat_line = lines[2].strip()
-        if not reason_sat_line.startswith('星期六原因:'):
-            logging.error("設定檔第三行格式錯誤，應為「星期六原因:」")
-            return None
-        reason_sat = reason_sat_line.split(':', 1)[1].strip()
-        
-        # 解析星期日原因
-        reason_sun_line = lines[3].strip()
-        if not reason_sun_line.startswith('星期日原因:'):
-            logging.error("設定檔第四行格式錯誤，應為「星期日原因:」")
+        invalid_day = next((d for d in day_chars if d not in DAY_MAP), None)
+        if invalid_day:
+            logging.error(f"無效的星期：{invalid_day}，請使用一、二、三、四、五、六、日")
             return None
-        reason_sun = reason_sun_line.split(':', 1)[1].strip()
+        days = sorted(DAY_MAP[d] for d in day_chars)
         
         return {
             'name': name,
-            'days': sorted(days),
-            'reason_sat': reason_sat,
-            'reason_sun': reason_sun
+            'days': days,
+            'day_names': [DAY_NAMES[d] for d in days],
+            'reason_sat': fields['星期六原因'],
+            'reason_sun': fields['星期日原因']
         }
     
     except FileNotFoundError:
@@ -104,6 +119,11 @@ def read_config_file(file_path="data.txt"):
         return None
 
 
+def count_chars(text):
+    """計算字數（不含空白，包含全形空白與不換行空白）。"""
+    return len(text.translate(_WS_DELETE))
+
+
 def validate_config(config):
     """
     驗證設定內容是否符合要求。
@@ -117,12 +137,11 @@ def validate_config(config):
     if 6 in days:
         if not reason_sat:
             print("\n錯誤：請假星期包含「星期六」，但未填寫星期六原因")
-            print("請在 data.txt 的第三行填寫至少 15 個字的原因（不含空白）")
+            print("請在 data.txt 的「星期六原因:」填寫至少 15 個字的原因（不含空白）")
             return False
         
         # 計算字數（不含空白）
-        reason_sat_no_space = reason_sat.replace(' ', '').replace('\t', '').replace('\n', '')
-        char_count = len(reason_sat_no_space)
+        char_count = count_chars(reason_sat)
         
         if char_count < 15:
             need_more = 15 - char_count
@@ -137,12 +156,11 @@ def validate_config(config):
     if 7 in days:
         if not reason_sun:
             print("\n錯誤：請假星期包含「星期日」，但未填寫星期日原因")
-            print("請在 data.txt 的第四行填寫至少 15 個字的原因（不含空白）")
+            print("請在 data.txt 的「星期日原因:」填寫至少 15 個字的原因（不含空白）")
             return False
         
         # 計算字數（不含空白）
-        reason_sun_no_space = reason_sun.replace(' ', '').replace('\t', '').replace('\n', '')
-        char_count = len(reason_sun_no_space)
+        char_count = count_chars(reason_sun)
         
         if char_count < 15:
             need_more = 15 - char_count
@@ -166,17 +184,14 @@ def display_config(config):
     
     print(f"\n姓名：{config['name']}")
     
-    day_list = [DAY_NAMES[d] for d in config['days']]
-    print(f"請假星期：{' 、 '.join(day_list)}")
+    print(f"請假星期：{' 、 '.join(config['day_names'])}")
     
     if 6 in config['days']:
-        reason_sat_no_space = config['reason_sat'].replace(' ', '').replace('\t', '').replace('\n', '')
-        char_count = len(reason_sat_no_space)
+        char_count = count_chars(config['reason_sat'])
         print(f"星期六原因：{config['reason_sat']} ({char_count} 字)")
     
     if 7 in config['days']:
-        reason_sun_no_space = config['reason_sun'].replace(' ', '').replace('\t', '').replace('\n', '')
-        char_count = len(reason_sun_no_space)
+        char_count = count_chars(config['reason_sun'])
         print(f"星期日原因：{config['reason_sun']} ({char_count} 字)")
     
     print("=" * 60)
@@ -198,19 +213,22 @@ def prepare_submission_data(day_number, mode, name, reason=None, leave_option="
     
     # 步驟 2: 取得 fbzx token
     try:
-        response_get = requests.get(viewform_url)
+        response_get = SESSION.get(viewform_url, headers=FORM_HEADERS, timeout=REQUEST_TIMEOUT)
         response_get.raise_for_status()
-        match = re.search(r'name="fbzx" value="([^"]+)"', response_get.text)
+        match = FBZX_RE.search(response_get.content)
         if not match:
             logging.error(f"[{day_name}] 找不到 fbzx token。")
             return None
-        fbzx = match.group(1)
+        fbzx = match.group(1).decode('ascii')
+    except requests.exceptions.Timeout as e:
+        logging.error(f"[{day_name}] 準備 token 時訪問表單頁面逾時: {e}")
+        return None
     except requests.exceptions.RequestException as e:
         logging.error(f"[{day_name}] 準備 token 時無法訪問表單頁面: {e}")
         return None
         
-    # 步驟 3: 取得欄位 ID
-    name_entry, option_entry, reason_entry = fetch_form_entry_ids_for_day(viewform_url, day_number)
+    # 步驟 3: 取得欄位 ID（直接沿用步驟 2 已下載的頁面，不再重複請求）
+    name_entry, option_entry, reason_entry = fetch_form_entry_ids_for_day(viewform_url, day_number, html=response_get.content)
     if not name_entry or not option_entry or (day_number >= 6 and not reason_entry):
         logging.error(f"[{day_name}] 無法取得必要的欄位 ID。")
         return None
@@ -235,6 +253,24 @@ def prepare_submission_data(day_number, mode, name, reason=None, leave_option="
     }
 
 
+def scan_submission_markers(body, scan_from, success_end=-1):
+    """
+    在回應的原始 bytes 中尋找成功訊息及其後的「提交其他回應」連結，只掃描 scan_from 之後新收到的部分
+    （往前多看一個標記長度，以免漏掉跨越兩個 chunk 的標記）。
+    success_end 為上次呼叫找到的成功訊息結束位置（尚未找到為 -1）。
+    返回 (success_end, 是否兩個特徵都已出現)。
+    """
+    if success_end < 0:
+        index = body.find(SUCCESS_MESSAGE_BYTES, max(0, scan_from - len(SUCCESS_MESSAGE_BYTES) + 1))
+        if index < 0:
+            return -1, False
+        success_end = index + len(SUCCESS_MESSAGE_BYTES)
+        link_from = success_end
+    else:
+        link_from = max(success_end, scan_from - len(SUBMIT_ANOTHER_LINK_BYTES) + 1)
+    return success_end, body.find(SUBMIT_ANOTHER_LINK_BYTES, link_from) >= 0
+
+
 def execute_submission(submission_data):
     """
     執行單一表單的提交並驗證結果。
@@ -244,46 +280,112 @@ def execute_submission(submission_data):
     logging.info(f"[{day_name}] 正在提交...")
     
     try:
-        with requests.Session() as session:
-            response_post = session.post(
-                submission_data["url"],
-                headers=submission_data["headers"],
-                data=submission_data["payload"]
-            )
-            
+        # 以串流方式讀取回應，兩個成功特徵都出現就提早結束，不必下載或解碼整個頁面
+        with SESSION.post(
+            submission_data["url"],
+            headers=submission_data["headers"],
+            data=submission_data["payload"],
+            timeout=REQUEST_TIMEOUT,
+            stream=True
+        ) as response_post:
             # 檢查 HTTP 狀態碼 (例如 404, 500)
             response_post.raise_for_status() 
             
-            response_text = response_post.text
-            
-            # 根據您提供的截圖和 HTML，定義成功的具體特徵
-            # 1. 成功訊息文字
-            success_message = "我們已經收到您回覆的表單。"
-            # 2. "提交其他回應" 的連結文字
-            submit_another_link_text = "提交其他回應"
-            
-            # 必須 *同時* 包含這兩個特徵，才算是真正的成功
-            if success_message in response_text and submit_another_link_text in response_text:
-                logging.info(f"[{day_name}] 提交成功！ (已驗證回應內容包含 \"{success_message}\" 和 \"{submit_another_link_text}\")")
-                return submission_data["day_number"], True
-            else:
-                # 狀態碼 200，但未找到完整的成功特徵
-                logging.error(f"[{day_name}] 提交失敗！ (狀態碼 200，但未在回應中找到必要的成功訊息)")
-                
-                # 可選：增加更詳細的日誌，方便除錯
-                logging.debug(f"[{day_name}] 檢查 \"{success_message}\": {success_message in response_text}")
-                logging.debug(f"[{day_name}] 檢查 \"{submit_another_link_text}\": {submit_another_link_text in response_text}")
-                return submission_data["day_number"], False
+            body = bytearray()
+            success_end = -1
+            for chunk in response_post.iter_content(8192):
+                scan_from = len(body)
+                body += chunk
+                # 必須 *同時* 包含這兩個特徵，才算是真正的成功
+                success_end, succeeded = scan_submission_markers(body, scan_from, success_end)
+                if succeeded:
+                    logging.info(f"[{day_name}] 提交成功！ (已驗證回應內容包含 \"{SUCCESS_MESSAGE}\" 和 \"{SUBMIT_ANOTHER_LINK_TEXT}\")")
+                    return submission_data["day_number"], True
+        
+        # 狀態碼 200，但未找到完整的成功特徵
+        logging.error(f"[{day_name}] 提交失敗！ (狀態碼 200，但未在回應中找到必要的成功訊息)")
+        
+        # 可選：增加更詳細的日誌，方便除錯（只在啟用 DEBUG 時才進行額外的搜尋）
+        if logging.getLogger().isEnabledFor(logging.DEBUG):
+            logging.debug(f"[{day_name}] 檢查 \"{SUCCESS_MESSAGE}\": {SUCCESS_MESSAGE_BYTES in body}")
+            logging.debug(f"[{day_name}] 檢查 \"{SUBMIT_ANOTHER_LINK_TEXT}\": {SUBMIT_ANOTHER_LINK_BYTES in body}")
+        return submission_data["day_number"], False
                 
+    except requests.exceptions.Timeout as e:
+        logging.error(f"[{day_name}] 提交逾時： {e}")
+        return submission_data["day_number"], False
     except requests.exceptions.RequestException as e:
         # 捕捉所有 Request 相關錯誤 (例如連線錯誤、超時、或 4xx/5xx 狀態碼)
         logging.error(f"[{day_name}] 提交時發生錯誤： {e}")
         return submission_data["day_number"], False
 
-def wait_for_scheduled_time():
+def _cached_getaddrinfo(host, port, *args, **kwargs):
+    """
+    帶有效期限的 socket.getaddrinfo。
+    requests/urllib3 本身不快取 DNS，每條新連線都會進行一次阻塞式查詢。
+    """
+    key = (host, port, args, tuple(sorted(kwargs.items())))
+    now = time.monotonic()
+    cached = _dns_cache.get(key)
+    if cached and cached[1] > now:
+        return cached[0]
+    result = _original_getaddrinfo(host, port, *args, **kwargs)
+    _dns_cache[key] = (result, now + DNS_CACHE_TTL_SECONDS)
+    return result
+
+
+def warm_dns_cache(hosts=DNS_WARM_HOSTS):
+    """
+    啟用 DNS 快取並預先解析指定主機，讓提交瞬間建立連線時不必再等待 DNS 查詢。
+    查詢參數與 urllib3 建立連線時相同，才能命中快取。
+    """
+    socket.getaddrinfo = _cached_getaddrinfo
+    for host in hosts:
+        try:
+            socket.getaddrinfo(host, 443, allowed_gai_family(), socket.SOCK_STREAM)
+        except OSError as e:
+            logging.warning(f"預先解析 {host} 的 DNS 失敗，提交時將重新查詢: {e}")
+
+
+def warm_up_connections(prepared_tasks):
+    """
+    在背景對每個待提交的表單送出 HEAD 請求，讓 TCP/TLS 握手在提交前完成，
+    之後的 POST 即可直接沿用共用 Session 連線池中的連線。
+    每個 HEAD 使用各自的短命 daemon 執行緒，不佔用提交用的執行緒池，
+    即使 HEAD 逾時或重試，T-0 的 POST 也不會排在它們後面。
+    """
+    def head_request(task):
+        try:
+            SESSION.head(task["url"], headers=task["headers"], timeout=1.0)
+        except requests.exceptions.RequestException as e:
+            logging.debug(f"[{task['day_name']}] 預熱連線失敗，提交時將重新建立連線: {e}")
+    
+    # 不等待完成，避免阻塞倒數計時
+    for task in prepared_tasks:
+        threading.Thread(target=head_request, args=(task,), daemon=True).start()
+
+
+def _tick_display(target_datetime, stop_event):
+    """
+    在背景執行緒中每 250ms 更新一次倒數顯示，直到 stop_event 被設定。
+    輸出終端機的 I/O 因此不會佔用排程執行緒的時間。
+    """
+    while not stop_event.is_set():
+        wait_seconds = max(0, (target_datetime - datetime.now()).total_seconds())
+        mins, secs = divmod(wait_seconds, 60)
+        hours, mins = divmod(mins, 60)
+        days, hours = divmod(hours, 24)
+        
+        timer_str = f"距離提交還有: {int(days)}天 {int(hours):02d}時 {int(mins):02d}分 {int(secs):02d}秒"
+        print(timer_str, end='\r')
+        stop_event.wait(0.25)
+
+
+def wait_for_scheduled_time(prepared_tasks=()):
     """
     計算並等待直到下一個星期三 13:59:59.750。
-    使用三階段精度控制（1s → 0.1s → 0.01s → 精確等待）確保準時執行。
+    以單調時鐘控制精度：每秒倒數 → 最後一次 sleep 到截止前 2ms → 忙等待到目標時間。
+    最後 2 秒會預先建立 prepared_tasks 所需的連線。
     """
     now = datetime.now()
     # 星期三的 weekday() 是 2 (星期一為0)
@@ -308,34 +410,41 @@ def wait_for_scheduled_time():
     print(f"   {target_datetime.strftime('%Y-%m-%d %H:%M:%S.%f')[:-3]}")
     print("=" * 60)
 
-    # 倒數計時顯示
+    # 以單調時鐘表示截止時間，最後關頭只需比較 time.monotonic()，不再反覆呼叫 datetime.now()
+    deadline_mono = time.monotonic() + wait_seconds
+
+    # 倒數計時顯示交給背景執行緒，排程執行緒只負責 sleep 與觸發
+    stop_display = threading.Event()
+    threading.Thread(target=_tick_display, args=(target_datetime, stop_display), daemon=True).start()
+
     try:
-        while wait_seconds > 0:
-            mins, secs = divmod(wait_seconds, 60)
-            hours, mins = divmod(mins, 60)
-            days, hours = divmod(hours, 24)
-            
-            timer_str = f"距離提交還有: {int(days)}天 {int(hours):02d}時 {int(mins):02d}分 {int(secs):02d}秒"
-            print(timer_str, end='\r')
-            
-            # 決定 sleep 的時間，越接近目標時間，檢查頻率越高
-            if wait_seconds > 60:
-                time.sleep(1)
-            elif wait_seconds > 5:
-                time.sleep(0.1)
-            elif wait_seconds > 0.5:
-                # 最後 5 秒：每 0.01 秒檢查一次（10ms 精度）
-                time.sleep(0.01)
-            else:
-                # 最後 0.5 秒：精確等待到目標時間
-                time.sleep(wait_seconds)
-                break
-            
-            wait_seconds = (target_datetime - datetime.now()).total_seconds()
+        # 每秒醒來一次，直到剩下 5 秒
+        while deadline_mono - time.monotonic() > 5:
+            time.sleep(max(0, min(1, deadline_mono - time.monotonic() - 5)))
+            # 長時間等待期間依牆上時鐘重新校正（例如電腦休眠後喚醒或系統校時）
+            deadline_mono = time.monotonic() + (target_datetime - datetime.now()).total_seconds()
+        
+        # 最後 5 秒：預先解析 DNS，把查詢從提交瞬間移開
+        warm_dns_cache()
         
+        # 最後 2 秒：預先完成 TCP/TLS 握手
+        remaining = deadline_mono - time.monotonic()
+        if remaining > 2:
+            time.sleep(remaining - 2)
+        warm_up_connections(prepared_tasks)
+        
+        # 一次睡到截止前 2ms，再以忙等待對準目標時間
+        remaining = deadline_mono - time.monotonic()
+        if remaining > 0.002:
+            time.sleep(remaining - 0.002)
+        while time.monotonic() < deadline_mono:
+            pass
+        
+        stop_display.set()
         print("\n時間到達，立即開始提交！")
 
     except KeyboardInterrupt:
+        stop_display.set()
         print("\n\n使用者手動中斷等待，程式結束。")
         sys.exit(0)
 
@@ -345,6 +454,9 @@ if __name__ == "__main__":
     print("Google 表單自動填寫工具 (多執行緒/排程版)")
     print("=" * 60 + "\n")
     
+    # 程式結束時關閉共用的 HTTP 連線池
+    atexit.register(close_session)
+    
     # 讀取並驗證設定
     config = read_config_file("data.txt")
     if not config:
@@ -355,6 +467,12 @@ if __name__ == "__main__":
     if not validate_config(config):
         sys.exit(1)
     
+    # 每天要填寫的原因（只有星期六、日需要），整次執行固定不變
+    reasons_by_day = {
+        day_number: config['reason_sat'] if day_number == 6 else config['reason_sun'] if day_number == 7 else None
+        for day_number in config['days']
+    }
+    
     # 使用者確認
     confirm = input("\n請確認以上設定是否正確 (Y/n): ").strip().lower()
     if confirm and confirm not in ['y', 'yes', '是']:
@@ -380,35 +498,29 @@ if __name__ == "__main__":
     
     prepared_tasks = []
     prep_failed_tasks = []
-    with ThreadPoolExecutor(max_workers=len(config['days'])) as executor:
-        # 使用多執行緒來加速資料準備過程
-        future_to_day = {
-            executor.submit(
-                prepare_submission_data,
-                day_number, mode, config['name'], 
-                config['reason_sat'] if day_number == 6 else config['reason_sun'] if day_number == 7 else None
-            ): day_number for day_number in config['days']
-        }
-        
-        for future in as_completed(future_to_day):
-            result = future.result()
-            if result and result.get("status") == "prepared":
-                prepared_tasks.append(result)
-            else:
-                # 準備失敗 (已關閉或準備錯誤)
-                # 如果 result 是 None 或沒有 status，也視為失敗
-                if result:
-                    prep_failed_tasks.append(result)
-                else:
-                    # 處理極端情況，future 返回了 None
-                    day_num = future_to_day[future]
-                    logging.error(f"[{DAY_NAMES[day_num]}] 資料準備時返回了無效結果 (None)。")
-                    prep_failed_tasks.append({
-                        "day_number": day_num,
-                        "day_name": DAY_NAMES[day_num],
-                        "status": "prep_failed",
-                        "error": "返回了無效結果 (None)"
-                    })
+    # 準備與提交兩個階段共用同一個執行緒池（最多 7 天，每天一個執行緒）
+    # 連線預熱不使用這個執行緒池，確保 T-0 時每個提交都有空閒的執行緒
+    executor = ThreadPoolExecutor(max_workers=len(config['days']), thread_name_prefix='form')
+    
+    # 使用多執行緒來加速資料準備過程
+    def prepare_one(day_number):
+        return day_number, prepare_submission_data(day_number, mode, config['name'], reasons_by_day[day_number])
+    
+    for day_num, result in executor.map(prepare_one, config['days']):
+        if result and result.get("status") == "prepared":
+            prepared_tasks.append(result)
+        elif result:
+            # 準備失敗 (已關閉或準備錯誤)
+            prep_failed_tasks.append(result)
+        else:
+            # 處理極端情況，prepare_submission_data 返回了 None
+            logging.error(f"[{DAY_NAMES[day_num]}] 資料準備時返回了無效結果 (None)。")
+            prep_failed_tasks.append({
+                "day_number": day_num,
+                "day_name": DAY_NAMES[day_num],
+                "status": "prep_failed",
+                "error": "返回了無效結果 (None)"
+            })
 
     if prepared_tasks:
         print("\n部分或所有表單資料已準備完成！")
@@ -420,7 +532,7 @@ if __name__ == "__main__":
     
     # --- 根據模式決定是否等待 ---
     if mode == 1:
-        wait_for_scheduled_time()
+        wait_for_scheduled_time(prepared_tasks)
     else: # mode == 0
         print("\n測試模式，立即開始提交...")
         
@@ -438,30 +550,31 @@ if __name__ == "__main__":
         failed_day_names.append(prep_failed['day_name'])
         fail_count += 1
 
-    with ThreadPoolExecutor(max_workers=len(prepared_tasks)) as executor:
-        future_to_task = {executor.submit(execute_submission, task): task for task in prepared_tasks}
+    future_to_task = {executor.submit(execute_submission, task): task for task in prepared_tasks}
+    
+    # 我們只迭代 as_completed 一次
+    for future in as_completed(future_to_task):
+        # 預先從字典中取得任務名稱，以防 future.result() 拋出異常
+        task_name = future_to_task[future]['day_name']
         
-        # 我們只迭代 as_completed 一次
-        for future in as_completed(future_to_task):
-            # 預先從字典中取得任務名稱，以防 future.result() 拋出異常
-            task_name = future_to_task[future]['day_name']
+        try:
+            day_num, success = future.result()
+            day_name_from_result = DAY_NAMES[day_num]
             
-            try:
-                day_num, success = future.result()
-                day_name_from_result = DAY_NAMES[day_num]
-                
-                if success:
-                    success_count += 1
-                    successful_day_names.append(day_name_from_result) # 存入成功列表
-                    print(f"{day_name_from_result} 提交成功")
-                else:
-                    fail_count += 1
-                    failed_day_names.append(day_name_from_result) # 存入失敗列表
-                    print(f"{day_name_from_result} 提交失敗")
-            except Exception as e:
+            if success:
+                success_count += 1
+                successful_day_names.append(day_name_from_result) # 存入成功列表
+                print(f"{day_name_from_result} 提交成功")
+            else:
                 fail_count += 1
-                failed_day_names.append(task_name) # 發生未預期錯誤，也存入失敗列表
-                logging.error(f"處理 [{task_name}] 任務時發生未預期的錯誤: {e}")
+                failed_day_names.append(day_name_from_result) # 存入失敗列表
+                print(f"{day_name_from_result} 提交失敗")
+        except Exception as e:
+            fail_count += 1
+            failed_day_names.append(task_name) # 發生未預期錯誤，也存入失敗列表
+            logging.error(f"處理 [{task_name}] 任務時發生未預期的錯誤: {e}")
+
+    executor.shutdown(wait=True)
 
     # 顯示總結
     print("\n" + "=" * 60)
@@ -486,7 +599,6 @@ if __name__ == "__main__":
     print("=" * 60)
 
     # 準備郵件內容
-    submitted_days = [DAY_NAMES[d] for d in config['days']]
     reasons = {}
     if 6 in config['days']:
         reasons['sat'] = config['reason_sat']
@@ -494,35 +606,27 @@ if __name__ == "__main__":
         reasons['sun'] = config['reason_sun']
     
     # 將失敗的表單名稱轉換為完整的任務字典格式（供郵件模板使用）
-    failed_tasks_for_email = []
-    
-    # 先加入準備階段失敗的任務
-    for prep_failed in prep_failed_tasks:
-        failed_tasks_for_email.append({
-            'day_name': prep_failed['day_name'],
-            'status': prep_failed.get('status', 'prep_failed')
-        })
-    
-    # 再加入提交階段失敗的任務（從 failed_day_names 中排除已在 prep_failed_tasks 的）
-    prep_failed_names = [task['day_name'] for task in prep_failed_tasks]
-    for failed_name in failed_day_names:
-        if failed_name not in prep_failed_names:
-            # 這是提交階段失敗的表單
-            failed_tasks_for_email.append({
-                'day_name': failed_name,
-                'status': 'submission_failed'
-            })
+    # 先列出準備階段失敗的任務，再加入提交階段失敗的任務（排除已在 prep_failed_tasks 的）
+    prep_failed_names = {task['day_name'] for task in prep_failed_tasks}
+    failed_tasks_for_email = [
+        {'day_name': task['day_name'], 'status': task.get('status', 'prep_failed')}
+        for task in prep_failed_tasks
+    ] + [
+        {'day_name': failed_name, 'status': 'submission_failed'}
+        for failed_name in failed_day_names if failed_name not in prep_failed_names
+    ]
     
     # 計算實際的 all_success：只有當沒有任何失敗（包括準備階段和提交階段）時才為 True
     summary_data = {
-        'submitted_days': submitted_days,
+        'submitted_days': config['day_names'],
         'reasons': reasons,
         'all_success': fail_count == 0 and len(prep_failed_tasks) == 0,
         'successful_day_names': successful_day_names,  # 新增成功的表單列表
         'failed_tasks': failed_tasks_for_email  # 使用完整的失敗任務字典
     }
 
-    # 發送郵件
+    # 發送郵件（郵件模組到這裡才載入，避免拖慢程式啟動與互動式確認）
+    from mail.send_mail import send_summary_email
     email_sent = send_summary_email(summary_data)
     if email_sent:
         print("總結郵件已成功發送。")